@@ -9,9 +9,13 @@ from typing import List, Dict
 import os
 import docx
 import PyPDF2
-from io import BytesIO
+from io import BytesIO, StringIO
 import time
-from io import BytesIO
+import json
+import re
+import codecs
+import zipfile
+import xml.etree.ElementTree as ET
 
 
 def create_processing_indicator():
@@ -36,7 +40,24 @@ def read_pdf(file):
     except Exception as e:
         raise ValueError(f"Error reading PDF: {str(e)}")
 
-def read_docx(file):
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK_TAG = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+HEADER_PART_PATTERN = re.compile(r'word/header(\d*)\.xml')
+FOOTER_PART_PATTERN = re.compile(r'word/footer(\d*)\.xml')
+
+def read_docx(file, include_headers_footers: bool = False):
+    try:
+        if not isinstance(file, str):
+            # Reset file pointer to beginning
+            file.seek(0)
+        return read_docx_streaming(file, include_headers_footers)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        # Fall back to python-docx for files the streaming reader cannot parse
+        return read_docx_with_python_docx(file)
+    except Exception as e:
+        raise ValueError(f"Error reading DOCX: {str(e)}")
+
+def read_docx_with_python_docx(file):
     try:
         if isinstance(file, str):
             doc = docx.Document(file)
@@ -51,6 +72,107 @@ def read_docx(file):
     except Exception as e:
         raise ValueError(f"Error reading DOCX: {str(e)}")
 
+def read_docx_streaming(file, include_headers_footers: bool = False) -> str:
+    # Parse the XML parts straight from the zip instead of building the python-docx object model
+    text = StringIO()
+    with zipfile.ZipFile(file) as archive:
+        names = archive.namelist()
+        parts = ['word/document.xml']
+        if include_headers_footers:
+            parts = find_docx_parts(names, HEADER_PART_PATTERN) + parts + find_docx_parts(names, FOOTER_PART_PATTERN)
+        for part in parts:
+            with archive.open(part) as xml_file:
+                for line in iter_docx_xml_lines(xml_file):
+                    text.write(line + "\n")
+    return text.getvalue()
+
+def find_docx_parts(names, pattern):
+    # Order by numeric suffix so header10.xml comes after header2.xml
+    matches = [match for match in map(pattern.fullmatch, names) if match]
+    matches.sort(key=lambda match: int(match.group(1) or 0))
+    return [match.string for match in matches]
+
+def iter_docx_xml_lines(xml_file):
+    # Yields one line per paragraph; table rows are yielded as tab-separated cells.
+    # Completed elements are cleared as we go so memory stays bounded on large files.
+    paragraphs = []
+    rows = []
+    cells = []
+    tables = []
+    ancestors = []
+    depth = 0
+    run_depth = 0
+    fallback_depth = 0
+
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            depth += 1
+            if depth <= 2:
+                del ancestors[depth - 1:]
+                ancestors.append(elem)
+            if tag == MC_FALLBACK_TAG:
+                fallback_depth += 1
+            if fallback_depth:
+                continue
+            if tag == WORD_NAMESPACE + 'p':
+                paragraphs.append([])
+            elif tag == WORD_NAMESPACE + 'r':
+                run_depth += 1
+            elif tag == WORD_NAMESPACE + 'tbl':
+                tables.append(elem)
+            elif tag == WORD_NAMESPACE + 'tr':
+                rows.append([])
+            elif tag == WORD_NAMESPACE + 'tc':
+                cells.append([])
+            continue
+
+        elem_depth = depth
+        depth -= 1
+        if tag == MC_FALLBACK_TAG:
+            # Fallback content duplicates the preferred choice (e.g. text boxes)
+            fallback_depth -= 1
+        elif fallback_depth:
+            pass
+        elif tag == WORD_NAMESPACE + 't':
+            if paragraphs:
+                paragraphs[-1].append(elem.text or "")
+        elif tag == WORD_NAMESPACE + 'r':
+            run_depth -= 1
+        elif tag == WORD_NAMESPACE + 'tab':
+            # Tab stop definitions in w:pPr/w:tabs are also w:tab; only run content is text
+            if paragraphs and run_depth:
+                paragraphs[-1].append("\t")
+        elif tag in (WORD_NAMESPACE + 'br', WORD_NAMESPACE + 'cr'):
+            if paragraphs and run_depth:
+                paragraphs[-1].append("\n")
+        elif tag == WORD_NAMESPACE + 'p':
+            line = "".join(paragraphs.pop())
+            if cells:
+                cells[-1].append(line)
+            else:
+                yield line
+        elif tag == WORD_NAMESPACE + 'tc':
+            cell_text = " ".join(line for line in cells.pop() if line)
+            if rows:
+                rows[-1].append(cell_text)
+        elif tag == WORD_NAMESPACE + 'tr':
+            line = "\t".join(rows.pop())
+            if cells:
+                cells[-1].append(line)
+            else:
+                yield line
+                # A transcript can be one large table, so drop its finished rows too
+                tables[-1].clear()
+        elif tag == WORD_NAMESPACE + 'tbl':
+            tables.pop()
+
+        # Drop finished top-level blocks (body children, or header/footer paragraphs)
+        if elem_depth == 2:
+            ancestors[0].clear()
+        elif elem_depth == 3 and ancestors[1].tag == WORD_NAMESPACE + 'body':
+            ancestors[1].clear()
+
 def read_vtt(file):
     try:
         if isinstance(file, str):
@@ -63,26 +185,24 @@ def read_vtt(file):
         
         # Remove VTT header and metadata
         lines = content.split('\n')
-        text = ""
-        skip_line = True
-        
-        for line in lines:
-            # Skip WEBVTT header and timestamps
-            if line.strip() == 'WEBVTT':
-                continue
-            if '-->' in line:
-                continue
-            if not line.strip():
-                continue
-            if line.strip().isdigit():
-                continue
-            # Add the actual text content
-            text += line.strip() + " "
-        
-        return text.strip()
+        return " ".join(vtt_text_lines(lines))
     except Exception as e:
         raise ValueError(f"Error reading VTT: {str(e)}")
 
+def vtt_text_lines(lines):
+    for line in lines:
+        # Skip WEBVTT header and timestamps
+        if line.strip() == 'WEBVTT':
+            continue
+        if '-->' in line:
+            continue
+        if not line.strip():
+            continue
+        if line.strip().isdigit():
+            continue
+        # Yield the actual text content
+        yield line.strip()
+
 def read_txt(file):
     try:
         if isinstance(file, str):
@@ -117,6 +237,171 @@ def read_file(file):
         raise ValueError(f"Error processing file: {str(e)}")
 
 
+# Required sections of the generated document, in order. "count" is the allowed
+# (min, max) number of items; "depends_on" sections are regenerated together;
+# "needs_source" sections are regenerated from the source text, not the document.
+DOCUMENT_SECTIONS = [
+    {"name": "Title and Speaker Information", "aliases": ["Title and Speaker"], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Quotes", "aliases": [], "count": None, "depends_on": None, "needs_source": True},
+    {"name": "Closing Statements", "aliases": ["Closing Remarks"], "count": None, "depends_on": None, "needs_source": True},
+    {"name": "Briefing Document", "aliases": ["Briefing"], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Themes and Ideas", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Notable Quotes with Context", "aliases": ["Notable Quotes"], "count": None, "depends_on": None, "needs_source": True},
+    {"name": "FAQ Section", "aliases": ["FAQ", "FAQs", "Frequently Asked Questions"], "count": (10, 10), "depends_on": None, "needs_source": False},
+    {"name": "Quiz Questions", "aliases": ["Quiz"], "count": (10, 10), "depends_on": None, "needs_source": False},
+    {"name": "Quiz Answer Key", "aliases": ["Answer Key", "Quiz Answers"], "count": (10, 10), "depends_on": "Quiz Questions", "needs_source": False},
+    {"name": "Essay Questions", "aliases": [], "count": (5, 7), "depends_on": None, "needs_source": False},
+    {"name": "Essay Answers", "aliases": [], "count": None, "depends_on": "Essay Questions", "needs_source": False},
+    {"name": "Speaker Bio", "aliases": ["Speaker Biography", "About the Speaker"], "count": None, "depends_on": None, "needs_source": False}
+]
+
+COURSE_SECTIONS = [
+    {"name": "Course Title and Instructor Information", "aliases": ["Course Title and Instructor"], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Course Overview", "aliases": [], "count": None, "depends_on": None, "needs_source": True},
+    {"name": "Lecture Summaries", "aliases": [], "count": None, "depends_on": None, "needs_source": True},
+    {"name": "Key Themes and Ideas", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Notable Quotes with Context", "aliases": ["Notable Quotes"], "count": None, "depends_on": None, "needs_source": True},
+    {"name": "FAQ Section", "aliases": ["FAQ", "FAQs", "Frequently Asked Questions"], "count": (10, 10), "depends_on": None, "needs_source": False},
+    {"name": "Quiz Questions", "aliases": ["Quiz"], "count": (10, 10), "depends_on": None, "needs_source": False},
+    {"name": "Quiz Answer Key", "aliases": ["Answer Key", "Quiz Answers"], "count": (10, 10), "depends_on": "Quiz Questions", "needs_source": False},
+    {"name": "Essay Questions", "aliases": [], "count": (5, 7), "depends_on": None, "needs_source": False},
+    {"name": "Essay Answers", "aliases": [], "count": None, "depends_on": "Essay Questions", "needs_source": False}
+]
+
+# Problems that a follow-up request can fix; duplicates and ordering are only reported or reordered
+REPAIRABLE_PROBLEMS = ("missing", "empty", "count")
+
+HEADER_PATTERN = re.compile(r'^\s*(#{1,6})\s+(.*)$')
+NUMBERED_ITEM_PATTERN = re.compile(r'^\s?(?:\*\*)?(?:Q|Question\s*)?(\d+)[.):]\s*\S', re.IGNORECASE)
+SUBHEADER_PATTERN = re.compile(r'^\s*#{2,6}\s+\S')
+QUESTION_MARKER_PATTERN = re.compile(r'^\s?(?:[-*]\s+)?(?:\*\*)?(?:Q\d*\s*[:.)]|Question\b)', re.IGNORECASE)
+BULLET_QUESTION_PATTERN = re.compile(r'^\s?[-*]\s+.*\?[*_]*\s*$')
+
+def normalize_header(header: str) -> str:
+    # Normalize "7. **FAQ Section (exactly 10)**:" to "faq section"
+    normalized = re.sub(r'\(.*?\)', '', header).strip(' #*_:').lower()
+    normalized = re.sub(r'^\d+[.)]\s*', '', normalized).strip(' *_:')
+    return re.sub(r'\s+', ' ', normalized)
+
+def match_section_name(header: str, sections: List[Dict]):
+    normalized = normalize_header(header)
+    for section in sections:
+        names = [section["name"]] + section.get("aliases", [])
+        if normalized in (name.lower() for name in names):
+            return section["name"]
+    return None
+
+def find_section_headers(lines: List[str], sections: List[Dict]) -> Dict[int, str]:
+    # Sections sit at the shallowest heading level that uses a known section name, so a
+    # "## Key Quotes" subheader inside another section is not mistaken for the section.
+    # A deeper header still counts when its section has no header at that level.
+    matches = {}
+    for index, line in enumerate(lines):
+        header_match = HEADER_PATTERN.match(line)
+        if header_match:
+            name = match_section_name(header_match.group(2), sections)
+            if name:
+                matches[index] = (name, len(header_match.group(1)))
+    if not matches:
+        return {}
+    section_level = min(level for _, level in matches.values())
+    top_level_names = {name for name, level in matches.values() if level == section_level}
+    return {
+        index: name for index, (name, level) in matches.items()
+        if level == section_level or name not in top_level_names
+    }
+
+def split_sections(markdown_content: str, sections: List[Dict]):
+    # Returns (preamble, [(section name, header line, body), ...]) in document order.
+    # Headers that are not section boundaries stay inside the current section body.
+    lines = markdown_content.replace("```markdown", "").replace("```", "").split('\n')
+    headers = find_section_headers(lines, sections)
+    preamble = []
+    found = []
+    for index, line in enumerate(lines):
+        if index in headers:
+            found.append([headers[index], line.strip(), []])
+        elif found:
+            found[-1][2].append(line)
+        else:
+            preamble.append(line)
+    return '\n'.join(preamble).strip(), [(name, header, '\n'.join(body).strip()) for name, header, body in found]
+
+def count_section_items(body: str) -> int:
+    # Count top-level items only: numbered options ("1) ...") or numbered answer lines
+    # repeat numbers already used by the items, so take the run of distinct numbers 1..n
+    lines = body.split('\n')
+    numbers = set()
+    for line in lines:
+        numbered_match = NUMBERED_ITEM_PATTERN.match(line)
+        if numbered_match:
+            numbers.add(int(numbered_match.group(1)))
+    numbered = 0
+    while numbered + 1 in numbers:
+        numbered += 1
+    subheaders = sum(1 for line in lines if SUBHEADER_PATTERN.match(line))
+    questions = sum(
+        1 for line in lines if QUESTION_MARKER_PATTERN.match(line) or BULLET_QUESTION_PATTERN.match(line)
+    )
+    return max(numbered, subheaders, questions)
+
+def validate_document(markdown_content: str, sections: List[Dict] = DOCUMENT_SECTIONS) -> List[Dict]:
+    preamble, found = split_sections(markdown_content, sections)
+    order = [section["name"] for section in sections]
+    issues = []
+
+    bodies = {}
+    if preamble and not (found and found[0][0] == order[0]):
+        # The model often replaces the title header with the talk title itself
+        bodies[order[0]] = [preamble]
+    for name, _, body in found:
+        bodies.setdefault(name, []).append(body)
+
+    for section in sections:
+        name = section["name"]
+        if name not in bodies:
+            issues.append({"section": name, "problem": "missing", "detail": "Section is missing"})
+            continue
+        if len(bodies[name]) > 1:
+            issues.append({"section": name, "problem": "duplicate", "detail": f"Section appears {len(bodies[name])} times"})
+        body = bodies[name][0]
+        if not body:
+            issues.append({"section": name, "problem": "empty", "detail": "Section has no content"})
+        elif section["count"]:
+            low, high = section["count"]
+            count = count_section_items(body)
+            if not low <= count <= high:
+                expected = str(low) if low == high else f"{low}-{high}"
+                issues.append({"section": name, "problem": "count", "detail": f"Found {count} items, expected {expected}"})
+
+    found_order = [order.index(name) for name in dict.fromkeys(name for name, _, _ in found)]
+    if found_order != sorted(found_order):
+        issues.append({"section": None, "problem": "order", "detail": "Sections are out of order"})
+    return issues
+
+def splice_sections(markdown_content: str, replacements: Dict[str, str], sections: List[Dict] = DOCUMENT_SECTIONS) -> str:
+    # Rebuild the document in the required order, replacing or inserting the repaired sections.
+    # Every existing body is kept: a replacement only takes the place of the first copy.
+    preamble, found = split_sections(markdown_content, sections)
+    existing = {}
+    for name, header, body in found:
+        existing.setdefault(name, []).append((header, body))
+
+    # Replacements reuse the heading level of the previous section (or the first one found)
+    header_level = HEADER_PATTERN.match(found[0][1]).group(1) if found else "#"
+
+    parts = [preamble] if preamble else []
+    for section in sections:
+        name = section["name"]
+        copies = existing.get(name, [])
+        if name in replacements:
+            parts.append(f"{header_level} {name}\n\n{replacements[name].strip()}")
+            copies = copies[1:]
+        if copies:
+            header_level = HEADER_PATTERN.match(copies[0][0]).group(1)
+        parts.extend(f"{header}\n\n{body}" for header, body in copies)
+    return '\n\n'.join(parts) + '\n'
+
 
 class TranscriptProcessor:
     def __init__(self, api_key):
@@ -291,17 +576,19 @@ class TranscriptProcessor:
                 - Explain their importance
                 - Connect to main themes
 
-                # FAQ Section (around 20-25)
-                - Create relevant questions
+                # FAQ Section (exactly 10)
+                - Create exactly 10 relevant questions, numbered 1-10
                 - Provide 2-3 sentence answers
                 - Cover main topics
 
-                # Quiz Questions (around 15-20)
+                # Quiz Questions (exactly 10)
+                - Exactly 10 questions, numbered 1-10
                 - Mix of multiple choice and short answer
                 - Base on transcript content
                 - Include key concepts
 
                 # Quiz Answer Key
+                - One numbered answer for each of the 10 quiz questions
                 - Provide detailed explanations
                 - Reference transcript
                 - Explain reasoning
@@ -361,6 +648,15 @@ class TranscriptProcessor:
 
             result = crew.kickoff()
 
+            # Fill in only the sections that failed validation
+            status_text.text("Validating document structure...")
+            result = str(result)
+            try:
+                result = self.repair_document(result, speaker_name, source_text=transcript_text)
+            except Exception:
+                # Keep the full result; remaining issues can be repaired from the results view
+                pass
+
             # Post-process to remove any remaining pharmaceutical references
             processed_result = str(result).replace("Pfizer", "[REDACTED]")
             processed_result = processed_result.replace("pfizer", "[REDACTED]")
@@ -376,6 +672,556 @@ class TranscriptProcessor:
         except Exception as e:
             raise Exception(f"Error in processing: {str(e)}")
 
+    def run_single_task(self, agent, description: str, expected_output: str) -> str:
+        # Run one task with one agent; used for the small condense/merge/course steps
+        task = Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent
+        )
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=True
+        )
+        result = crew.kickoff()
+        return redact_pharma_references(str(result))
+
+    def condense_lecture(self, transcript_text: str, speaker_name: str, lecture_title: str) -> str:
+        try:
+            return self.run_single_task(
+                self.content_analyzer,
+                f"""Analyze this lecture transcript: {transcript_text}
+
+                This is the lecture "{lecture_title}" by {speaker_name}, part of a course series.
+                Create a CONDENSED analysis (at most 600 words) with these sections in this exact order:
+
+                ## Lecture Title
+                - An appropriate title for this lecture
+
+                ## Summary
+                - One paragraph summarizing the main discussion points and arguments
+
+                ## Key Themes
+                - 4-6 bullet points, each naming a theme and one sentence of supporting evidence
+
+                ## Key Quotes
+                - Up to 8 of the most impactful exact quotes, as a numbered list with quotation marks
+                - Preserving the original quote make the language formal and professional
+
+                ## Key Terms
+                - Important concepts and terminology introduced, as bullet points
+
+                IMPORTANT: DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES OR MENTIONS IN THE OUTPUT.
+                IMPORTANT: Ensure no other names are mentioned in the file apart from the speaker name provided or anything related to Pfizer.""",
+                """A condensed markdown analysis with Lecture Title, Summary, Key Themes, Key Quotes and Key Terms sections,
+                at most 600 words. Ensure no other names are mentioned apart from the speaker name provided or anything related to Pfizer."""
+            )
+        except Exception as e:
+            raise Exception(f"Error condensing lecture: {str(e)}")
+
+    def merge_summaries(self, summaries: List[str], label: str) -> str:
+        try:
+            joined = "\n\n---\n\n".join(summaries)
+            return self.run_single_task(
+                self.content_analyzer,
+                f"""Merge these condensed analyses of consecutive lectures ({label}) into ONE condensed analysis:
+
+                {joined}
+
+                Use the same sections in this exact order: ## Lecture Title (a title covering all merged lectures),
+                ## Summary, ## Key Themes, ## Key Quotes, ## Key Terms.
+                - Keep the result at most 600 words regardless of how many lectures it covers
+                - Combine overlapping themes and show how ideas develop from one lecture to the next
+                - Keep only the 8 most impactful quotes, copied exactly from the analyses above
+                - Do not invent content that is not present in the analyses above
+
+                IMPORTANT: DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES OR MENTIONS IN THE OUTPUT.""",
+                "A single condensed markdown analysis of at most 600 words with the same sections as the inputs."
+            )
+        except Exception as e:
+            raise Exception(f"Error merging summaries: {str(e)}")
+
+    def merge_segment_notes(self, notes: List[str], label: str) -> str:
+        try:
+            joined = "\n\n---\n\n".join(notes)
+            return self.run_single_task(
+                self.quote_extractor,
+                f"""Merge these running notes of consecutive parts of one lecture ({label}) into ONE set of notes:
+
+                {joined}
+
+                Use the same sections in this exact order: ## Summary, ## Key Themes, ## Key Quotes.
+                - Summary: at most 250 words covering all merged parts in order
+                - Key Themes: at most 8 bullet points
+                - Key Quotes: keep only the 8 most impactful quotes, copied exactly, one per line with quotation marks
+                - Do not invent content that is not present in the notes above
+
+                IMPORTANT: DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES OR MENTIONS IN THE OUTPUT.""",
+                "Markdown running notes with Summary, Key Themes and Key Quotes sections."
+            )
+        except Exception as e:
+            raise Exception(f"Error merging segment notes: {str(e)}")
+
+    def repair_document(self, document: str, speaker_name: str, sections: List[Dict] = DOCUMENT_SECTIONS, source_text: str = "", max_attempts: int = 2) -> str:
+        # Regenerate only missing or malformed sections instead of rerunning the whole crew
+        try:
+            issues = validate_document(document, sections)
+            for _ in range(max_attempts):
+                broken = [issue["section"] for issue in issues if issue["problem"] in REPAIRABLE_PROBLEMS]
+                if not broken:
+                    break
+
+                # A new quiz or essay question list needs a matching answer section
+                for section in sections:
+                    if section["depends_on"] in broken and section["name"] not in broken:
+                        broken.append(section["name"])
+                broken = [section["name"] for section in sections if section["name"] in broken]
+
+                _, found = split_sections(document, sections)
+                context = "\n\n".join(
+                    f"{header}\n{body}" for name, header, body in found if name not in broken and body
+                )
+                # Quotes and closing remarks cannot be rebuilt from the other generated sections
+                needs_source = any(section["needs_source"] for section in sections if section["name"] in broken)
+                if needs_source and source_text:
+                    source = f"Source material to take quotes and remarks from: {source_text}"
+                elif needs_source:
+                    source = "Only use quotes that already appear in the existing sections; do not invent quotes or remarks."
+                else:
+                    source = ""
+                requirements = "\n".join(
+                    f"- {issue['section']}: {issue['detail']}" for issue in issues if issue["section"] in broken
+                )
+                expected_counts = "\n".join(
+                    f"# {section['name']}" + (
+                        f" (exactly {section['count'][0]} items, numbered 1-{section['count'][0]})"
+                        if section["count"] and section["count"][0] == section["count"][1]
+                        else f" ({section['count'][0]}-{section['count'][1]} items, numbered)" if section["count"] else ""
+                    )
+                    for section in sections if section["name"] in broken
+                )
+
+                repaired = self.run_single_task(
+                    self.content_writer,
+                    f"""This document about a lecture by {speaker_name} has missing or malformed sections:
+                    {requirements}
+
+                    Existing sections of the document for reference: {context}
+
+                    {source}
+
+                    Write ONLY these sections, each starting with its exact header line as shown:
+                    {expected_counts}
+
+                    - Base the content on the existing sections and source material above
+                    - Answer keys and essay answers must match the questions written here
+                    - Do not repeat any other section
+                    IMPORTANT: DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES OR MENTIONS IN THE OUTPUT.""",
+                    f"Markdown containing only these sections with their exact headers: {', '.join(broken)}."
+                )
+
+                _, new_sections = split_sections(repaired, sections)
+                replacements = {}
+                for name, _, body in new_sections:
+                    if name in broken and body:
+                        replacements.setdefault(name, body)
+                if replacements:
+                    document = splice_sections(document, replacements, sections)
+                issues = validate_document(document, sections)
+
+            # Reordering needs no model call; a document that passed validation is returned as is
+            if any(issue["problem"] == "order" for issue in issues):
+                document = splice_sections(document, {}, sections)
+            return document
+        except Exception as e:
+            raise Exception(f"Error repairing document: {str(e)}")
+
+    def process_live_segment(self, segment_text: str, lecture_title: str, speaker_name: str, themes: str, quotes: List[str]) -> str:
+        try:
+            recent_quotes = "\n".join(f"- {quote}" for quote in quotes[-10:]) or "None yet"
+            return self.run_single_task(
+                self.quote_extractor,
+                f"""The lecture "{lecture_title}" by {speaker_name} is in progress. Here is the NEW part of the transcript: {segment_text}
+
+                Current key themes of the lecture so far:
+                {themes or "None yet"}
+
+                Quotes already extracted (do not repeat them):
+                {recent_quotes}
+
+                Write running notes with these sections in this exact order:
+
+                ## Summary
+                - 2-4 sentences summarizing only the new part of the transcript
+
+                ## Key Themes
+                - The updated list of key themes for the lecture so far, at most 8 bullet points
+                - Keep existing themes that still apply and add new ones from this part
+
+                ## Key Quotes
+                - Up to 3 of the most impactful exact quotes from the new part, one per line with quotation marks
+                - Preserving the original quote make the language formal and professional
+
+                IMPORTANT: DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES OR MENTIONS IN THE OUTPUT.""",
+                "Markdown running notes with Summary, Key Themes and Key Quotes sections."
+            )
+        except Exception as e:
+            raise Exception(f"Error processing live segment: {str(e)}")
+
+    def process_live_lecture(self, session: "LiveTranscriptSession", progress_bar, status_text) -> str:
+        try:
+            progress_bar.progress(0.1)
+            status_text.text("Processing remaining transcript...")
+            session.process_pending(self, final=True)
+
+            progress_bar.progress(0.4)
+            status_text.text("Collecting running notes...")
+            # The final document is built from the rolling state, not the full transcript
+            lecture_context = session.notes_context()
+            quotes = "\n".join(f"- {quote}" for quote in session.quotes)
+            section_list = "\n".join(
+                f"# {section['name']}" + (
+                    f" ({section['count'][0]})" if section["count"] and section["count"][0] == section["count"][1]
+                    else f" ({section['count'][0]}-{section['count'][1]})" if section["count"] else ""
+                )
+                for section in DOCUMENT_SECTIONS
+            )
+
+            result = self.run_single_task(
+                self.content_writer,
+                f"""Using these running notes of the lecture "{session.lecture_title}" by {session.speaker_name}: {lecture_context}
+
+                Key themes of the lecture:
+                {session.themes}
+
+                Extracted quotes:
+                {quotes}
+
+                Create a comprehensive document with the following sections IN THIS EXACT ORDER,
+                using exactly these headers and the item counts shown in parentheses:
+                {section_list}
+
+                - Base the title on the lecture title: {session.lecture_title}
+                - Include speaker name: {session.speaker_name}
+                - Key Quotes and Notable Quotes must use the extracted quotes above
+                - Number each FAQ, quiz question, quiz answer and essay question
+                - Each essay answer should have a title that is the essay question itself and three paragraphs
+
+                IMPORTANT: Maintain this exact section order and use proper markdown formatting with clear section headers.
+                DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES IN ANY SECTION.""",
+                """A comprehensive markdown document with all sections in the specified order:
+                    Title and Speaker Information, Key Quotes, Closing Statements, Briefing Document,
+                    Key Themes and Ideas, Notable Quotes, FAQ Section, Quiz Questions, Quiz Answer Key,
+                    Essay Questions, Essay Answers, and Speaker Bio."""
+            )
+
+            progress_bar.progress(0.9)
+            status_text.text("Validating document structure...")
+            try:
+                result = self.repair_document(result, session.speaker_name, source_text=session.source_context())
+            except Exception:
+                # Keep the full result; remaining issues can be repaired from the results view
+                pass
+
+            progress_bar.progress(1.0)
+            status_text.text("Processing complete!")
+            return result
+        except Exception as e:
+            raise Exception(f"Error in live processing: {str(e)}")
+
+    def process_course(self, series: "CourseSeries", progress_bar, status_text) -> str:
+        try:
+            progress_bar.progress(0.1)
+            status_text.text("Collecting course summary tree...")
+
+            course_context = series.tree_context()
+            lecture_summaries = series.lecture_summaries()
+            lecture_list = "\n".join(
+                f"{i + 1}. {lecture['title']}" for i, lecture in enumerate(series.lectures)
+            )
+
+            progress_bar.progress(0.3)
+            status_text.text("Creating course-level educational content...")
+
+            result = self.run_single_task(
+                self.content_writer,
+                f"""Using these condensed analyses of a course series: {course_context}
+
+                The course "{series.course_name}" taught by {series.speaker_name} covers these lectures in order:
+                {lecture_list}
+
+                Summary of each lecture:
+                {lecture_summaries}
+
+                Create a course-level document with the following sections IN THIS EXACT ORDER:
+
+                # Course Title and Instructor Information
+                - Course name: {series.course_name}
+                - Instructor: {series.speaker_name}
+
+                # Course Overview
+                - Summarize the arc of the course from the first lecture to the last
+
+                # Lecture Summaries
+                - One short paragraph per lecture, in order, based on the summary of each lecture
+
+                # Key Themes and Ideas
+                - Major themes that run across lectures
+                - Show how each theme develops over the course
+
+                # Notable Quotes with Context
+                - Most significant quotes from the analyses, with the lecture they come from
+
+                # FAQ Section (exactly 10)
+                - Questions covering the whole course
+                - Provide 2-3 sentence answers
+
+                # Quiz Questions (exactly 10)
+                - Mix of multiple choice and short answer
+                - Draw questions from across all lectures
+
+                # Quiz Answer Key
+                - Provide explanations referencing the relevant lecture
+
+                # Essay Questions (5-7)
+                - Thought-provoking questions connecting several lectures
+
+                # Essay Answers
+                - For each essay question, a three paragraph answer titled with the question itself
+
+                IMPORTANT: Maintain this exact section order and use proper markdown formatting with clear section headers.
+                DO NOT INCLUDE ANY PHARMACEUTICAL COMPANY REFERENCES IN ANY SECTION.""",
+                """A comprehensive course-level markdown document with all sections in the specified order:
+                    Course Title and Instructor Information, Course Overview, Lecture Summaries, Key Themes and Ideas,
+                    Notable Quotes with Context, FAQ Section, Quiz Questions, Quiz Answer Key, Essay Questions and Essay Answers."""
+            )
+
+            progress_bar.progress(0.9)
+            status_text.text("Validating document structure...")
+            try:
+                result = self.repair_document(result, series.speaker_name, COURSE_SECTIONS, series.source_context())
+            except Exception:
+                # Keep the full result; remaining issues can be repaired from the results view
+                pass
+
+            progress_bar.progress(1.0)
+            status_text.text("Processing complete!")
+            return result
+        except Exception as e:
+            raise Exception(f"Error in course processing: {str(e)}")
+
+
+def redact_pharma_references(text: str) -> str:
+    return text.replace("Pfizer", "[REDACTED]").replace("pfizer", "[REDACTED]")
+
+
+# Sections of a condensed lecture analysis (see condense_lecture)
+CONDENSED_SECTIONS = [
+    {"name": "Lecture Title", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Summary", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Themes", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Quotes", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Terms", "aliases": [], "count": None, "depends_on": None, "needs_source": False}
+]
+
+
+class CourseSeries:
+    """Condensed lecture analyses for a course, kept as a summary tree.
+
+    The tree is stored like a binary counter: ``levels[k]`` is either empty or a
+    node summarizing 2**k consecutive lectures. Adding a lecture carries merges
+    upward, so lecture N only costs its own condensing plus (amortized) one merge.
+    """
+
+    def __init__(self, course_name: str = "", speaker_name: str = ""):
+        self.course_name = course_name
+        self.speaker_name = speaker_name
+        self.lectures: List[Dict] = []
+        self.levels: List[Dict] = []
+
+    def add_lecture(self, title: str, summary: str, merge_fn) -> None:
+        start = len(self.lectures)
+        carry = {"summary": summary, "start": start, "end": start + 1}
+        levels = list(self.levels)
+
+        # Merge into a copy so a failed merge leaves the stored tree untouched
+        level = 0
+        while level < len(levels) and levels[level] is not None:
+            left = levels[level]
+            carry = {
+                "summary": merge_fn(
+                    [left["summary"], carry["summary"]],
+                    f"lectures {left['start'] + 1}-{carry['end']}"
+                ),
+                "start": left["start"],
+                "end": carry["end"]
+            }
+            levels[level] = None
+            level += 1
+
+        if level == len(levels):
+            levels.append(carry)
+        else:
+            levels[level] = carry
+
+        self.lectures.append({"title": title, "summary": summary})
+        self.levels = levels
+
+    def root_summaries(self) -> List[Dict]:
+        # Higher levels hold earlier lectures, so sort by start to keep course order
+        return sorted((node for node in self.levels if node is not None), key=lambda node: node["start"])
+
+    def tree_context(self) -> str:
+        # The tree roots cover every lecture with at most log2(N) + 1 summaries
+        return "\n\n---\n\n".join(
+            f"Lectures {node['start'] + 1}-{node['end']}:\n{node['summary']}" for node in self.root_summaries()
+        )
+
+    def lecture_summaries(self) -> str:
+        # One summary paragraph per lecture, taken from the stored leaves, so per-lecture
+        # detail does not shrink when the tree merges into fewer roots
+        paragraphs = []
+        for index, lecture in enumerate(self.lectures):
+            _, found = split_sections(lecture["summary"], CONDENSED_SECTIONS)
+            sections = {name: body for name, _, body in found}
+            paragraphs.append(f"Lecture {index + 1} ({lecture['title']}): {sections.get('Summary') or lecture['summary']}")
+        return "\n\n".join(paragraphs)
+
+    def source_context(self) -> str:
+        return f"{self.tree_context()}\n\nPer-lecture summaries:\n{self.lecture_summaries()}"
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "course_name": self.course_name,
+            "speaker_name": self.speaker_name,
+            "lectures": self.lectures,
+            "levels": self.levels
+        }, indent=2)
+
+    @classmethod
+    def from_json(cls, data: str) -> "CourseSeries":
+        try:
+            state = json.loads(data)
+            series = cls(state.get("course_name", ""), state.get("speaker_name", ""))
+            series.lectures = state["lectures"]
+            series.levels = state["levels"]
+            return series
+        except Exception as e:
+            raise ValueError(f"Error loading course state: {str(e)}")
+
+# Sections returned by each live segment update
+LIVE_SEGMENT_SECTIONS = [
+    {"name": "Summary", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Themes", "aliases": [], "count": None, "depends_on": None, "needs_source": False},
+    {"name": "Key Quotes", "aliases": [], "count": None, "depends_on": None, "needs_source": False}
+]
+QUOTE_LINE_PATTERN = re.compile(r'^\s*(?:(?:\d+[.)]|[-*>])\s*)?(?:\*\*|_)?(["\u201c].+)$')
+
+
+class LiveTranscriptSession:
+    """Rolling state for a lecture that is still being captioned.
+
+    New text is buffered until a full segment is available. Each segment is
+    processed once with the current themes and recent quotes, and at most one
+    merge of two equal-sized note nodes is done per update, so the cost of an
+    update does not grow with the length of the lecture. The final document is
+    written from the merged nodes (at most about log2(segments) + 1 of them).
+    """
+
+    def __init__(self, lecture_title: str = "", speaker_name: str = "", segment_words: int = 400, max_quotes: int = 25):
+        self.lecture_title = lecture_title
+        self.speaker_name = speaker_name
+        self.segment_words = segment_words
+        self.max_quotes = max_quotes
+        self.offset = 0
+        self.partial_line = ""
+        self.is_vtt = False
+        self.pending_words: List[str] = []
+        self.themes = ""
+        self.quotes: List[str] = []
+        self.notes: List[str] = []
+        # Each node summarizes "size" consecutive segments, in transcript order
+        self.nodes: List[Dict] = []
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def append_text(self, text: str, is_vtt: bool = False, final: bool = False) -> None:
+        # Only complete lines are used; a trailing partial line waits for the next append
+        self.is_vtt = is_vtt
+        lines = (self.partial_line + text).split('\n')
+        self.partial_line = "" if final else lines.pop()
+        if is_vtt:
+            lines = vtt_text_lines(lines)
+        for line in lines:
+            self.pending_words.extend(line.split())
+
+    def poll_file(self, path: str) -> int:
+        # Read only the bytes appended since the last checkpoint
+        try:
+            with open(path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+            self.offset += len(data)
+            if data:
+                self.append_text(self.decoder.decode(data), is_vtt=path.lower().endswith('.vtt'))
+            return len(data)
+        except Exception as e:
+            raise ValueError(f"Error reading live transcript: {str(e)}")
+
+    def notes_context(self) -> str:
+        return "\n\n---\n\n".join(node["summary"] for node in self.nodes)
+
+    def source_context(self) -> str:
+        quotes = "\n".join(f"- {quote}" for quote in self.quotes)
+        return f"{self.notes_context()}\n\nExtracted quotes:\n{quotes}"
+
+    def merge_once(self, nodes: List[Dict], merge_fn) -> List[Dict]:
+        # Merge the first adjacent pair of equal-sized nodes, if any
+        for index in range(len(nodes) - 1):
+            left, right = nodes[index], nodes[index + 1]
+            if left["size"] == right["size"]:
+                merged = {
+                    "summary": merge_fn(
+                        [left["summary"], right["summary"]],
+                        f"segments {left['start'] + 1}-{right['start'] + right['size']}"
+                    ),
+                    "start": left["start"],
+                    "size": left["size"] * 2
+                }
+                return nodes[:index] + [merged] + nodes[index + 2:]
+        return nodes
+
+    def process_pending(self, processor, final: bool = False) -> int:
+        processed = 0
+        if final and self.partial_line:
+            self.append_text("", is_vtt=self.is_vtt, final=True)
+        while len(self.pending_words) >= self.segment_words or (final and self.pending_words):
+            segment = " ".join(self.pending_words[:self.segment_words])
+            update = processor.process_live_segment(segment, self.lecture_title, self.speaker_name, self.themes, self.quotes)
+
+            _, found = split_sections(update, LIVE_SEGMENT_SECTIONS)
+            sections = {name: body for name, _, body in found}
+            # Only quoted lines count; remarks like "No new quotes" or attributions are skipped
+            new_quotes = []
+            for line in sections.get("Key Quotes", "").split('\n'):
+                quote_match = QUOTE_LINE_PATTERN.match(line)
+                if quote_match:
+                    new_quotes.append(quote_match.group(1).strip().rstrip('*_').strip())
+            leaf = {"summary": update, "start": len(self.notes), "size": 1}
+            nodes = self.merge_once(self.nodes + [leaf], processor.merge_segment_notes)
+
+            # Session state only changes once the segment call and merge have succeeded,
+            # so a failed update can be retried without storing the segment twice
+            if sections.get("Key Themes"):
+                self.themes = sections["Key Themes"]
+            self.quotes = (self.quotes + new_quotes)[-self.max_quotes:]
+            self.notes.append(update)
+            self.nodes = nodes
+            del self.pending_words[:self.segment_words]
+            processed += 1
+        return processed
+
 def markdown_to_pdf(markdown_content: str, filename: str):
     from xhtml2pdf import pisa
     import markdown2
@@ -583,12 +1429,81 @@ def markdown_to_docx(markdown_content: str) -> BytesIO:
     docx_data.seek(0)
     return docx_data
 
+def display_processed_document(processed_result: str, base_filename: str, sections: List[Dict] = DOCUMENT_SECTIONS, repair_fn=None):
+    st.markdown("### Processed Document")
+
+    # Structural check is cheap, so it runs on every rerun
+    issues = validate_document(processed_result, sections)
+    if issues:
+        st.warning("Some sections did not pass validation:\n" + "\n".join(
+            f"- {issue['section'] or 'Document'}: {issue['detail']}" for issue in issues
+        ))
+        # Duplicates are only reported; the repair step cannot resolve them
+        repairable = any(issue["problem"] in REPAIRABLE_PROBLEMS + ("order",) for issue in issues)
+        if repair_fn and repairable and st.button("Repair Sections"):
+            try:
+                with st.spinner("Regenerating only the affected sections..."):
+                    repair_fn()
+                st.rerun()
+            except Exception as e:
+                st.error(f"An error occurred during repair: {str(e)}")
+
+    # Create tabs for preview and raw markdown
+    tab1, tab2 = st.tabs(["Preview", "Raw Markdown"])
+
+    with tab1:
+        cleaned_content = processed_result.replace("```markdown", "").replace("```", "")
+        st.markdown(cleaned_content, unsafe_allow_html=True)
+
+    with tab2:
+        st.code(processed_result, language="markdown")
+
+    # Download options
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            label="Download as Markdown",
+            data=processed_result,
+            file_name=f"{base_filename}.md",
+            mime="text/markdown"
+        )
+    with col2:
+        # Generate Word document
+        docx_data = markdown_to_docx(cleaned_content)
+        st.download_button(
+            label="Download as Word",
+            data=docx_data,
+            file_name=f"{base_filename}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+    with col3:
+        # Generate PDF
+        pdf_data = markdown_to_pdf(cleaned_content, base_filename)
+        st.download_button(
+            label="Download as PDF",
+            data=pdf_data,
+            file_name=f"{base_filename}.pdf",
+            mime="application/pdf"
+        )
+
 # Streamlit UI
 st.title("Lecture Transcript Analysis Agent")
 
 # At the beginning of the Streamlit UI section, add:
 if 'processed_result' not in st.session_state:
     st.session_state.processed_result = None
+if 'processed_source' not in st.session_state:
+    st.session_state.processed_source = ""
+if 'course_series' not in st.session_state:
+    st.session_state.course_series = None
+if 'course_result' not in st.session_state:
+    st.session_state.course_result = None
+if 'course_uploader_key' not in st.session_state:
+    st.session_state.course_uploader_key = 0
+if 'live_session' not in st.session_state:
+    st.session_state.live_session = None
+if 'live_result' not in st.session_state:
+    st.session_state.live_result = None
 
 # In the sidebar, add the reset button:
 with st.sidebar:
@@ -596,10 +1511,19 @@ with st.sidebar:
     api_key = st.text_input("Enter your Gemini API Key:", type="password")
     if api_key:
         os.environ["GOOGLE_API_KEY"] = api_key
+
+    mode = st.radio("Processing mode:", ["Single Lecture", "Course Series", "Live Lecture"])
     
     # Add reset button
     if st.button("Reset Session"):
         st.session_state.processed_result = None
+        st.session_state.processed_source = ""
+        st.session_state.course_series = None
+        st.session_state.course_result = None
+        st.session_state.pop('course_name_input', None)
+        st.session_state.pop('course_speaker_input', None)
+        st.session_state.live_session = None
+        st.session_state.live_result = None
         st.rerun()
     
     st.markdown("""
@@ -617,7 +1541,208 @@ with st.sidebar:
     - Speaker Bio
     """)
 
-if api_key:
+if api_key and mode == "Course Series":
+    # Course state is saved as JSON so a semester can be continued week by week
+    state_file = st.file_uploader("Load saved course state (optional)", type=['json'])
+    if state_file and st.button("Load Course State"):
+        try:
+            loaded_series = CourseSeries.from_json(state_file.read().decode('utf-8'))
+            st.session_state.course_series = loaded_series
+            st.session_state.course_result = None
+            # Fill the inputs below from the loaded state instead of their defaults
+            st.session_state.course_name_input = loaded_series.course_name or "Course Series"
+            st.session_state.course_speaker_input = loaded_series.speaker_name or "Alkiviadis Vazacopoulos"
+        except Exception as e:
+            st.error(str(e))
+
+    if 'course_name_input' not in st.session_state:
+        st.session_state.course_name_input = "Course Series"
+    if 'course_speaker_input' not in st.session_state:
+        st.session_state.course_speaker_input = "Alkiviadis Vazacopoulos"
+    course_name = st.text_input("Enter course name:", key="course_name_input")
+    speaker_name = st.text_input("Enter speaker name (lecturer):", key="course_speaker_input")
+
+    if st.session_state.course_series is None:
+        st.session_state.course_series = CourseSeries(course_name, speaker_name)
+    series = st.session_state.course_series
+    series.course_name = course_name
+    series.speaker_name = speaker_name
+
+    if series.lectures:
+        st.markdown("#### Lectures in this course")
+        st.markdown("\n".join(f"{i + 1}. {lecture['title']}" for i, lecture in enumerate(series.lectures)))
+
+    # Changing the key clears the uploader once its files have been added
+    new_lectures = st.file_uploader(
+        "Upload new lecture transcripts (added in upload order)",
+        type=['txt', 'pdf', 'docx', 'vtt'],
+        accept_multiple_files=True,
+        key=f"course_uploader_{st.session_state.course_uploader_key}"
+    )
+
+    if new_lectures and st.button("Add Lectures to Course"):
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        failed = False
+        added = 0
+        try:
+            processor = TranscriptProcessor(api_key)
+            existing_titles = {lecture['title'] for lecture in series.lectures}
+            for index, uploaded_file in enumerate(new_lectures):
+                if uploaded_file.name in existing_titles:
+                    st.warning(f"Skipped {uploaded_file.name}: it is already in the course.")
+                    continue
+                status_text.text(f"Condensing {uploaded_file.name}...")
+                try:
+                    uploaded_file.seek(0)
+                    lecture_text = read_file(uploaded_file)
+                except Exception as e:
+                    st.error(f"Error reading {uploaded_file.name}: {str(e)}")
+                    failed = True
+                    continue
+                # Only the new lecture is analyzed; earlier lectures are reused from the tree
+                summary = processor.condense_lecture(lecture_text, speaker_name, uploaded_file.name)
+                series.add_lecture(uploaded_file.name, summary, processor.merge_summaries)
+                existing_titles.add(uploaded_file.name)
+                added += 1
+                progress_bar.progress((index + 1) / len(new_lectures))
+        except Exception as e:
+            st.error(f"An error occurred during processing: {str(e)}")
+            failed = True
+        finally:
+            progress_bar.empty()
+            status_text.empty()
+
+        if added:
+            st.session_state.course_result = None
+        # Keep the messages and uploaded files on screen if anything went wrong
+        if not failed:
+            st.session_state.course_uploader_key += 1
+            st.rerun()
+
+    if series.lectures:
+        col1, col2 = st.columns(2)
+        with col1:
+            build_course = st.button("Build Course Document")
+        with col2:
+            st.download_button(
+                label="Save Course State",
+                data=series.to_json(),
+                file_name=f"{course_name.replace(' ', '_')}_course_state.json",
+                mime="application/json"
+            )
+
+        if build_course:
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            try:
+                processor = TranscriptProcessor(api_key)
+                st.session_state.course_result = processor.process_course(series, progress_bar, status_text)
+            except Exception as e:
+                st.error(f"An error occurred during processing: {str(e)}")
+            finally:
+                progress_bar.empty()
+                status_text.empty()
+
+    def repair_course_result():
+        st.session_state.course_result = TranscriptProcessor(api_key).repair_document(
+            st.session_state.course_result, speaker_name, COURSE_SECTIONS, series.source_context()
+        )
+
+    if st.session_state.course_result:
+        display_processed_document(
+            st.session_state.course_result,
+            f"{time.strftime('%Y-%m-%d')}_{course_name.replace(' ', '_')}_Course_Analysis",
+            COURSE_SECTIONS,
+            repair_course_result
+        )
+elif api_key and mode == "Live Lecture":
+    lecture_title = st.text_input("Enter lecture title:", "Live Lecture")
+    speaker_name = st.text_input("Enter speaker name (lecturer):", "Alkiviadis Vazacopoulos")
+
+    if st.session_state.live_session is None:
+        st.session_state.live_session = LiveTranscriptSession(lecture_title, speaker_name)
+    session = st.session_state.live_session
+    session.lecture_title = lecture_title
+    session.speaker_name = speaker_name
+
+    source = st.radio("Transcript source:", ["Growing file (.vtt/.txt)", "Paste new captions"])
+    if source == "Growing file (.vtt/.txt)":
+        live_path = st.text_input("Path to the transcript file being captioned:")
+        auto_refresh = st.checkbox("Check for new captions every 30 seconds")
+    else:
+        live_path = None
+        auto_refresh = False
+        # The form clears on submit so the same captions are not added twice
+        with st.form("live_captions", clear_on_submit=True):
+            new_text = st.text_area("New captions since the last update:")
+            is_vtt = st.checkbox("Captions are in VTT format")
+            add_captions = st.form_submit_button("Add Captions")
+        if add_captions and new_text:
+            session.append_text(new_text + "\n", is_vtt=is_vtt)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        update_notes = st.button("Process New Segments")
+    with col2:
+        finalize = st.button("Finalize Document")
+
+    if update_notes or auto_refresh:
+        try:
+            if live_path:
+                session.poll_file(live_path)
+            if len(session.pending_words) >= session.segment_words:
+                with st.spinner("Processing new segments..."):
+                    session.process_pending(TranscriptProcessor(api_key))
+        except Exception as e:
+            st.error(f"An error occurred during processing: {str(e)}")
+
+    if finalize:
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        try:
+            if live_path:
+                session.poll_file(live_path)
+            processor = TranscriptProcessor(api_key)
+            st.session_state.live_result = processor.process_live_lecture(session, progress_bar, status_text)
+        except Exception as e:
+            st.error(f"An error occurred during processing: {str(e)}")
+        finally:
+            progress_bar.empty()
+            status_text.empty()
+
+    st.caption(
+        f"{len(session.notes)} segments processed, "
+        f"{len(session.pending_words)} words waiting for the next segment of {session.segment_words}"
+    )
+
+    if st.session_state.live_result:
+        def repair_live_result():
+            st.session_state.live_result = TranscriptProcessor(api_key).repair_document(
+                st.session_state.live_result, speaker_name, source_text=session.source_context()
+            )
+
+        display_processed_document(
+            st.session_state.live_result,
+            f"{time.strftime('%Y-%m-%d')}_Live_Transcript_Analysis",
+            repair_fn=repair_live_result
+        )
+    elif session.notes:
+        st.markdown("### Running Notes")
+        if session.themes:
+            st.markdown("#### Key Themes So Far")
+            st.markdown(session.themes)
+        if session.quotes:
+            st.markdown("#### Recent Quotes")
+            st.markdown("\n".join(f"- {quote}" for quote in session.quotes))
+        for index, note in reversed(list(enumerate(session.notes))):
+            with st.expander(f"Segment {index + 1}", expanded=index == len(session.notes) - 1):
+                st.markdown(note)
+
+    if auto_refresh and not st.session_state.live_result:
+        time.sleep(30)
+        st.rerun()
+elif api_key:
     # Main UI components
     speaker_name = st.text_input("Enter speaker name (lecturer):", "Alkiviadis Vazacopoulos")
 
@@ -659,6 +1784,8 @@ if api_key:
                             progress_bar,
                             status_text
                         )
+                        # Kept so sections that need the transcript can be repaired later
+                        st.session_state.processed_source = combined_text
 
                     except Exception as e:
                         st.error(f"An error occurred during processing: {str(e)}")
@@ -680,8 +1807,6 @@ if api_key:
 
         # In the display results section:
         if st.session_state.processed_result:
-            st.markdown("### Processed Document")
-            
             # Get the original filename and extract date
             original_filename = uploaded_files[0].name if uploaded_files else "transcript"
             file_date = extract_date_from_filename(original_filename)
@@ -689,42 +1814,16 @@ if api_key:
             # Create base filename for downloads
             base_filename = f"{file_date}_Transcript_Analysis"
             
-            # Create tabs for preview and raw markdown
-            tab1, tab2 = st.tabs(["Preview", "Raw Markdown"])
-            
-            with tab1:
-                cleaned_content = st.session_state.processed_result.replace("```markdown", "").replace("```", "")
-                st.markdown(cleaned_content, unsafe_allow_html=True)
-            
-            with tab2:
-                st.code(st.session_state.processed_result, language="markdown")
-
-            # Download options
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.download_button(
-                    label="Download as Markdown",
-                    data=st.session_state.processed_result,
-                    file_name=f"{base_filename}.md",
-                    mime="text/markdown"
-                )
-            with col2:
-                # Generate Word document
-                docx_data = markdown_to_docx(cleaned_content)
-                st.download_button(
-                    label="Download as Word",
-                    data=docx_data,
-                    file_name=f"{base_filename}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
-            with col3:
-                # Generate PDF
-                pdf_data = markdown_to_pdf(cleaned_content, base_filename)
-                st.download_button(
-                    label="Download as PDF",
-                    data=pdf_data,
-                    file_name=f"{base_filename}.pdf",
-                    mime="application/pdf"
+            def repair_processed_result():
+                st.session_state.processed_result = TranscriptProcessor(api_key).repair_document(
+                    st.session_state.processed_result, speaker_name,
+                    source_text=st.session_state.processed_source
                 )
+
+            display_processed_document(
+                st.session_state.processed_result,
+                base_filename,
+                repair_fn=repair_processed_result
+            )
 else:
     st.warning("Please enter your Gemini API key in the sidebar to continue.")
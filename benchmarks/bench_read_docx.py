@@ -0,0 +1,105 @@
+"""Benchmark the streaming DOCX reader against the python-docx reader.
+
+Generates a large Word transcript (paragraphs, tables, header and footer) and
+runs each reader in its own subprocess, reporting the best wall time and the
+peak RSS added by the read. Run from the repository root with the
+requirements installed:
+
+    python benchmarks/bench_read_docx.py --pages 150
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+READERS = {
+    'python-docx': 'read_docx_with_python_docx',
+    'streaming': 'read_docx_streaming',
+}
+
+SENTENCE = ("Optimization models let us reason about trade-offs that are hard to see "
+            "when we only look at one decision at a time. ")
+
+
+def build_docx(path, pages):
+    import docx
+
+    doc = docx.Document()
+    doc.sections[0].header.paragraphs[0].text = "Lecture transcript"
+    doc.sections[0].footer.paragraphs[0].text = "Course series"
+    for page in range(pages):
+        doc.add_heading(f"Part {page + 1}", level=2)
+        # Roughly one page of speech per iteration
+        for _ in range(8):
+            doc.add_paragraph(SENTENCE * 4)
+        if page % 5 == 0:
+            table = doc.add_table(rows=6, cols=3)
+            for row_index, row in enumerate(table.rows):
+                for col_index, cell in enumerate(row.cells):
+                    cell.text = f"Row {row_index} column {col_index}"
+    doc.save(path)
+
+
+def max_rss_mb():
+    # On Linux ru_maxrss keeps the parent's peak across exec, so prefer VmHWM
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_reader(reader, path, repeats):
+    sys.path.insert(0, os.getcwd())
+    import app
+
+    read = getattr(app, READERS[reader])
+    rss_before = max_rss_mb()
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        text = read(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{best:.4f} {max_rss_mb() - rss_before:.1f} {len(text)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=150)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--reader', choices=READERS, help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.reader:
+        run_reader(args.reader, args.path, args.repeats)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transcript.docx')
+        build_docx(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1024:.0f} KB")
+
+        results = {}
+        for reader in READERS:
+            output = subprocess.run(
+                [sys.executable, __file__, '--reader', reader, '--path', path, '--repeats', str(args.repeats)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            seconds, peak_mb, chars = output.split()
+            results[reader] = (float(seconds), float(peak_mb))
+            print(f"{reader:>12}: {float(seconds) * 1000:8.1f} ms  peak +{float(peak_mb):6.1f} MB  {chars} chars")
+
+        baseline, streaming = results['python-docx'], results['streaming']
+        print(f"speedup: {baseline[0] / streaming[0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Checks for the document validator, which decides when repair calls are made.
+
+Run from the repository root with the requirements installed:
+
+    python -m pytest tests
+"""
+import app
+
+
+def numbered(count, text="Item"):
+    return "\n".join(f"{i}. {text} {i}?" for i in range(1, count + 1))
+
+
+def build_document(faq=None, header="#"):
+    sections = {
+        "Title and Speaker Information": "Talk title",
+        "Key Quotes": '1. "A quote"',
+        "Closing Statements": "Closing remarks",
+        "Briefing Document": "Overview\n\n## Key Themes\nBriefing subsection",
+        "Key Themes and Ideas": "Theme content",
+        "Notable Quotes with Context": "Quote context",
+        "FAQ Section": faq if faq is not None else numbered(10, "Question"),
+        "Quiz Questions": numbered(10),
+        "Quiz Answer Key": numbered(10, "Answer"),
+        "Essay Questions": numbered(5),
+        "Essay Answers": "### Essay 1?\nAnswer",
+        "Speaker Bio": "Bio",
+    }
+    return "\n".join(f"{header} {name}\n{body}\n" for name, body in sections.items())
+
+
+def test_quiz_with_numbered_options_counts_questions():
+    quiz = "\n".join(
+        f"**Question {i}:** What is {i}?\n1) first\n2) second\n3) third" for i in range(1, 11)
+    )
+    assert app.count_section_items(quiz) == 10
+
+
+def test_faq_as_bold_bullets():
+    faq = "\n".join(f"* **What is topic {i}?**\n  It is explained here." for i in range(1, 11))
+    assert app.count_section_items(faq) == 10
+
+
+def test_faq_with_numbered_answer_lines():
+    faq = "\n".join(f"{i}. What is topic {i}?\n{i}. It is explained here." for i in range(1, 11))
+    assert app.count_section_items(faq) == 10
+
+
+def test_faq_with_bullet_question_markers():
+    faq = "\n".join(f"- **Q:** What is topic {i}?\n  **A:** It is explained here." for i in range(1, 11))
+    assert app.count_section_items(faq) == 10
+
+
+def test_short_list_is_counted():
+    assert app.count_section_items(numbered(8)) == 8
+
+
+def test_valid_document_is_returned_unchanged():
+    document = build_document()
+    assert app.validate_document(document) == []
+    assert "Theme content" in app.splice_sections(document, {})
+
+
+def test_frequently_asked_questions_header_is_recognized():
+    document = build_document().replace("# FAQ Section", "# Frequently Asked Questions")
+    assert app.validate_document(document) == []
+
+
+def test_duplicate_section_is_reported_and_kept():
+    document = build_document() + "\n# Speaker Bio\nSecond bio\n"
+    problems = [(issue["section"], issue["problem"]) for issue in app.validate_document(document)]
+    assert problems == [("Speaker Bio", "duplicate")]
+    assert "Second bio" in app.splice_sections(document, {})
+
+
+def test_replacement_uses_document_heading_level():
+    document = build_document(faq=numbered(7, "Question"), header="##")
+    spliced = app.splice_sections(document, {"FAQ Section": numbered(10, "Question")})
+    assert "## FAQ Section" in spliced
+    assert "\n# FAQ Section" not in spliced
+    assert app.validate_document(spliced) == []